@@ -1,76 +1,171 @@
 import os
+import numpy as np
+from numba import njit
 dir = os.path.dirname(os.path.abspath(__file__))
 
+@njit(cache=True)
+def _sweep_holdings(buy_day, buy_row, sell_day, sell_row, first_day, n_days, n_rows, capacity):
+    """双指针扫描已按日期排序的买入/卖出事件, 以 (offsets, rows) CSR 形式输出每日持仓的交易行号 (按行号升序)"""
+    n_trades = buy_day.shape[0]
+    active_list = np.empty(n_rows, np.int64)   # 当前持仓交易行号 (无序)
+    active_pos = np.empty(n_rows, np.int64)    # 行号在 active_list 中的位置, 用于 O(1) 删除
+    n_active = 0
+
+    offsets = np.empty(n_days + 1, np.int64)
+    out_rows = np.empty(capacity, np.int64)
+    offsets[0] = 0
+    bi = si = k = 0
+
+    for d in range(n_days):
+        day = first_day + d
+        while bi < n_trades and buy_day[bi] <= day:
+            r = buy_row[bi]
+            active_list[n_active] = r
+            active_pos[r] = n_active
+            n_active += 1
+            bi += 1
+        while si < n_trades and sell_day[si] <= day:
+            r = sell_row[si]
+            last = active_list[n_active - 1]
+            active_list[active_pos[r]] = last
+            active_pos[last] = active_pos[r]
+            n_active -= 1
+            si += 1
+        # 按行号排序输出, 与 CSV 行顺序一致
+        rows = np.sort(active_list[:n_active])
+        for j in range(n_active):
+            out_rows[k] = rows[j]
+            k += 1
+        offsets[d + 1] = k
+
+    return offsets, out_rows
+
 def parse_daily_holdings():
     import pandas as pd
-    from tqdm import tqdm
-    import json
+    import pyarrow as pa
+    import pyarrow.csv as pv
+    import orjson
+    import pickle
+    from concurrent.futures import ThreadPoolExecutor
 
     # === 读取 lxr_assets.json ===
-    with open("/home/chuyin/work/stk/config/lxr_assets.json", "r", encoding="utf-8") as f:
-        lxr_assets = json.load(f)
-    
-    # 构建股票代码到资产信息的映射
-    asset_map = {}
-    for asset in lxr_assets:
-        code = asset["stockCode"]
-        exchange = asset["exchange"].upper()
-        
-        # 存储不带后缀的代码映射（用于查找）
-        asset_map[code] = {
-            "exchange": exchange,
-            "ipo_date": asset.get("ipoDate", "").split("T")[0] if asset.get("ipoDate") else "",
-            "delist_date": asset.get("delistedDate", "").split("T")[0] if asset.get("delistedDate") else "",
+    # 解析后的 asset_map 缓存为 pickle, 源文件更新(mtime 更新)或缓存损坏/格式不符时重新构建
+    assets_path = "/home/chuyin/work/stk/config/lxr_assets.json"
+    assets_cache_path = f"{dir}/lxr_assets.cache.pkl"
+    asset_map = None
+    if os.path.exists(assets_cache_path) and os.path.getmtime(assets_cache_path) >= os.path.getmtime(assets_path):
+        try:
+            with open(assets_cache_path, "rb") as f:
+                asset_map = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError, TypeError, ImportError):
+            asset_map = None
+        if not (isinstance(asset_map, dict)
+                and all(isinstance(v, tuple) and len(v) == 3 for v in asset_map.values())):
+            asset_map = None
+
+    if asset_map is None:
+        with open(assets_path, "rb") as f:
+            lxr_assets = orjson.loads(f.read())
+
+        # 构建股票代码(不带后缀)到 (交易所, 上市日期, 退市日期) 的映射, 日期只保留 ISO 前缀 YYYY-MM-DD
+        asset_map = {
+            asset["stockCode"]: (
+                asset["exchange"].upper(),
+                (asset.get("ipoDate") or "")[:10],
+                (asset.get("delistedDate") or "")[:10],
+            )
+            for asset in lxr_assets
         }
 
-    # === 读取 CSV 数据 ===
-    df = pd.read_csv(f"{dir}/small_cap_100_trades.csv", dtype={"股票代码": str})
+        # 先写临时文件再原子替换, 中断的写入不会留下被当作有效缓存的半截文件
+        tmp_cache_path = f"{assets_cache_path}.{os.getpid()}.tmp"
+        with open(tmp_cache_path, "wb") as f:
+            pickle.dump(asset_map, f, protocol=5)
+        os.replace(tmp_cache_path, assets_cache_path)
 
-    # 将日期转为 datetime 格式
-    df["买入日期"] = pd.to_datetime(df["买入日期"])
-    df["卖出日期"] = pd.to_datetime(df["卖出日期"])
+    # === 读取 CSV 数据 ===
+    # pyarrow 直接按列类型解析为 Arrow 列; 股票代码必须显式指定为 string, 否则会被推断为整数丢失前导 0
+    convert_options = pv.ConvertOptions(column_types={
+        "股票代码": pa.string(),
+        "股票名": pa.string(),
+        "行业分类": pa.string(),
+        "二级行业": pa.string(),
+        "买入日期": pa.timestamp("s"),
+        "卖出日期": pa.timestamp("s"),
+    })
+    df = pv.read_csv(f"{dir}/small_cap_100_trades.csv", convert_options=convert_options).to_pandas(types_mapper=pd.ArrowDtype)
 
     # === 目标1:生成每日持仓列表 ===
     # 找出最早买入和最晚卖出时间，构造完整日期序列
     all_days = pd.date_range(df["买入日期"].min(), df["卖出日期"].max(), freq='D')
 
-    # 构造每日持仓字典
+    # 买入/卖出日期转为自 epoch 起的天数 (空日期, 如未卖出的持仓, 转为 NaT)
+    codes = df["股票代码"].to_numpy(dtype=object)
+    buy_days = df["买入日期"].to_numpy(dtype="datetime64[D]", na_value=np.datetime64("NaT")).view("int64")
+    sell_days = df["卖出日期"].to_numpy(dtype="datetime64[D]", na_value=np.datetime64("NaT")).view("int64")
+    first_day = all_days[:1].to_numpy().astype("datetime64[D]").view("int64")[0]
+
+    # 只有买入/卖出日期都存在且 买入日 < 卖出日 的交易会产生持仓 (买入日 <= day < 卖出日), 每笔贡献 (卖出日 - 买入日) 天
+    # NaT 视图为 int64 最小值, 必须在排序前剔除, 否则会被最先扫描到
+    nat = np.datetime64("NaT").view("int64")
+    valid = (buy_days != nat) & (sell_days != nat) & (sell_days > buy_days)
+    rows = np.flatnonzero(valid)
+    n_trades = len(rows)
+    buy_days, sell_days = buy_days[valid], sell_days[valid]
+    capacity = int((sell_days - buy_days).sum())
+
+    # 买入/卖出事件按日期排序, 双指针扫描维护当日持仓的交易行号
+    buy_order = np.argsort(buy_days, kind="stable")
+    sell_order = np.argsort(sell_days, kind="stable")
+    offsets, out_rows = _sweep_holdings(
+        buy_days[buy_order], rows[buy_order],
+        sell_days[sell_order], rows[sell_order],
+        first_day, len(all_days), len(df), capacity,
+    )
+    held_codes = codes[out_rows]
+
+    # 构造每日持仓字典 (按行号输出, 与 CSV 行顺序一致; 日期键一次性向量化格式化)
+    day_keys = all_days.strftime("%Y-%m-%d").tolist()
     daily_holdings = {}
+    for i, day_key in enumerate(day_keys):
+        daily_holdings[day_key] = held_codes[offsets[i]:offsets[i + 1]].tolist()
 
-    for day in tqdm(all_days):
-        holding_today = df[(df["买入日期"] <= day) & (df["卖出日期"] > day)]
-        daily_holdings[str(day.date())] = list(holding_today["股票代码"])
+    print(f"daily holdings: {len(all_days)} days, {n_trades} trades")
 
     # === 目标2:提取股票信息字典 ===
-    stock_info = {}
-    for _, row in tqdm(df.iterrows()):
-        code = row["股票代码"]
-        
-        # 从 asset_map 获取交易所和日期信息
-        asset_info = asset_map.get(code, {"exchange": "", "ipo_date": "", "delist_date": ""})
-        exchange = asset_info["exchange"]
-        
-        # 构建带交易所后缀的完整代码
-        if exchange:
-            full_code = f"{code}.{exchange}"
-        else:
-            full_code = code
-        
-        if full_code not in stock_info:
-            stock_info[full_code] = {
-                "name": row["股票名"],
-                "industry": row["行业分类"],
-                "sub_industry": row["二级行业"],
-                "ipo_date": asset_info["ipo_date"],
-                "delist_date": asset_info["delist_date"],
-            }
+    # 按股票代码去重后与资产信息做一次 left join, 未匹配到的股票交易所/日期留空
+    assets_df = pd.DataFrame.from_dict(asset_map, orient="index", columns=["exchange", "ipo_date", "delist_date"])
+    unique_df = df.drop_duplicates("股票代码")[["股票代码", "股票名", "行业分类", "二级行业"]]
+    merged = unique_df.merge(assets_df, left_on="股票代码", right_index=True, how="left")
+    merged[["exchange", "ipo_date", "delist_date"]] = merged[["exchange", "ipo_date", "delist_date"]].fillna("")
+
+    # 构建带交易所后缀的完整代码
+    merged["full_code"] = np.where(
+        merged["exchange"] != "",
+        merged["股票代码"] + "." + merged["exchange"],
+        merged["股票代码"],
+    )
+
+    stock_info = (
+        merged.rename(columns={"股票名": "name", "行业分类": "industry", "二级行业": "sub_industry"})
+        .set_index("full_code")[["name", "industry", "sub_industry", "ipo_date", "delist_date"]]
+        .to_dict(orient="index")
+    )
 
     # === 输出结果为 JSON 格式 ===
-    with open(f"{dir}/asset_daily_holdings.json", "w", encoding="utf-8") as f:
-        json.dump(daily_holdings, f, ensure_ascii=False, indent=2)
+    # orjson 直接输出 UTF-8 bytes; 每日持仓体量大, 不做缩进, 股票信息保留缩进便于人工查看
+    # 两个文件在线程池中并行写出, result() 传播写入异常
+    def write_json(path, obj, option=None):
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=option))
 
-    with open(f"{dir}/asset_list.json", "w", encoding="utf-8") as f:
-        json.dump(stock_info, f, ensure_ascii=False, indent=2)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(write_json, f"{dir}/asset_daily_holdings.json", daily_holdings),
+            executor.submit(write_json, f"{dir}/asset_list.json", stock_info, orjson.OPT_INDENT_2),
+        ]
+        for future in futures:
+            future.result()
 
 if __name__ == '__main__':
     parse_daily_holdings()
\ No newline at end of file
@@ -29,15 +29,23 @@ else
     CMAKE_ARGS="$CMAKE_ARGS -DPROFILE_MODE=OFF"
 fi
 
-# Configure
+# Configure (skipped when compiler and CMake arguments match the last configure;
+# CMakeLists.txt changes are picked up by Ninja, which reruns CMake during the build)
+CONFIGURE_STAMP="build/configure.stamp"
+CONFIGURE_INPUTS="CC=$CC CXX=$CXX $CMAKE_ARGS"
 echo ""
-echo "Configuring with CMake..."
-cmake $CMAKE_ARGS
+if [ ! -f "build/CMakeCache.txt" ] || [ "$(cat "$CONFIGURE_STAMP" 2>/dev/null)" != "$CONFIGURE_INPUTS" ]; then
+    echo "Configuring with CMake..."
+    cmake $CMAKE_ARGS
+    echo "$CONFIGURE_INPUTS" > "$CONFIGURE_STAMP"
+else
+    echo "CMake configuration unchanged, skipping configure"
+fi
 
 # Build
 echo ""
 echo "Building..."
-cmake --build build --parallel
+cmake --build build --parallel "$(nproc)"
 
 # Copy compile_commands.json for clangd
 if [ -f "build/compile_commands.json" ]; then
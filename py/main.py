@@ -21,13 +21,10 @@ def build_main_project():
     # Trigger build.sh
     print("Building C++ project: main")
     
-    env = os.environ.copy()
-    profile_mode = env.get('PROFILE_MODE', 'OFF')
-    
+    # build.sh reads PROFILE_MODE from the inherited environment (set by run.py)
     result = subprocess.run(
         ["./build.sh"],
         cwd=cpp_project_dir,
-        env=env,
         check=False
     )
     
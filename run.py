@@ -1,4 +1,5 @@
 import os
+import shutil
 import subprocess
 import sys
 import time
@@ -35,9 +36,9 @@ def _cleanup_background_processes():
         f"app_{APP_NAME}",            # Old app instances
     ]
 
-    for pattern in processes_to_kill:
-        subprocess.run(["pkill", "-9", "-f", pattern],
-                       capture_output=True, check=False)
+    # One pkill with an alternation pattern instead of one process spawn per pattern
+    subprocess.run(["pkill", "-9", "-f", "|".join(processes_to_kill)],
+                   capture_output=True, check=False)
 
     time.sleep(0.3)
 
@@ -52,9 +53,7 @@ def _cleanup_old_profiler():
 def _find_pprof_command():
     """Find pprof executable."""
     for cmd in ["pprof", "google-pprof", os.path.expanduser("~/go/bin/pprof")]:
-        result = subprocess.run(
-            ["which", cmd], capture_output=True, check=False)
-        if result.returncode == 0:
+        if shutil.which(cmd):
             return cmd
     return None
 
@@ -99,8 +98,10 @@ def run_with_profiling(binary_path, working_dir):
     profile_file = os.path.join(working_dir, "profile.out")
 
     _cleanup_old_profiler()
-    if os.path.exists(profile_file):
+    try:
         os.remove(profile_file)
+    except FileNotFoundError:
+        pass
 
     print(f"Running with gperftools profiler ({CPUPROFILE_FREQUENCY} Hz)...")
 